@@ -54,6 +54,7 @@ const ChatInput: React.FC<ChatInputProps> = (props) => {
   const [isModelMenuOpen, setIsModelMenuOpen] = useState<boolean>(false);
   const [showAllModels, setShowAllModels] = useState<boolean>(false);
   const [availableModels, setAvailableModels] = useState<ModelConfig[]>([]);
+  const [modelsLoadFailed, setModelsLoadFailed] = useState<boolean>(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
   const textInputRef = useRef<HTMLTextAreaElement>(null);
 
@@ -85,6 +86,7 @@ const ChatInput: React.FC<ChatInputProps> = (props) => {
       // Use cached models to prevent redundant API calls
       const models = await ModelsCache.get();
       setAvailableModels(models);
+      setModelsLoadFailed(false);
       
       // Load from localStorage first, then default to first available
       const storedModel = localStorage.getItem("preferred_model");
@@ -101,6 +103,7 @@ const ChatInput: React.FC<ChatInputProps> = (props) => {
       }
     } catch (e) {
       console.error("[ChatInput] Error loading models:", e);
+      setModelsLoadFailed(true);
     }
   };
 
@@ -199,12 +202,41 @@ const ChatInput: React.FC<ChatInputProps> = (props) => {
     }
 
     if (hasPdfs && !currentModelSupportsPdf) {
-      toast.info("Switching to Gemini for PDF support", {
-        description: "PDFs are best handled by Gemini 2.0 Flash. Switching model automatically.",
+      if (availableModels.length === 0) {
+        if (modelsLoadFailed) {
+          toast.error("Couldn't load models", {
+            description: "The model list failed to load, so no PDF-capable model can be selected. Please reload the page and try again.",
+            duration: 5000,
+          });
+        } else {
+          toast.error("Models are still loading", {
+            description: "Please wait for the model list to load before attaching PDFs.",
+            duration: 5000,
+          });
+        }
+        return;
+      }
+
+      // Auto-switch to an available model that supports PDFs (prefer favorites).
+      // Images in this drop or already attached also need vision, otherwise they go to a model that can't read them
+      const needsVision = hasImages || content.some(c => isImageData(c.content));
+      const canHandleFiles = (m: ModelConfig) =>
+        !!m.capabilities?.includes("pdf") && (!needsVision || !!m.capabilities?.includes("vision"));
+      const pdfModel = favoriteModels.find(canHandleFiles) ?? availableModels.find(canHandleFiles);
+      if (!pdfModel) {
+        toast.error(needsVision ? "No model supports both PDFs and images" : "No model supports PDFs", {
+          description: needsVision
+            ? "None of the available models can process PDF files and images together."
+            : "None of the available models can process PDF files.",
+          duration: 5000,
+        });
+        return;
+      }
+      toast.info(`Switching to ${pdfModel.display_name} for PDF support`, {
+        description: `${currentModelConfig?.display_name || 'This model'} cannot process PDFs. Switching model automatically.`,
         duration: 4000,
       });
-      // Auto-switch to Gemini for PDF support
-      await handleSelectModel("gemini-2.0-flash");
+      await handleSelectModel(pdfModel.id);
     }
 
     // Increment the upload counter for each allowed file
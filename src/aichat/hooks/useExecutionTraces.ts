@@ -57,10 +57,15 @@ export function useExecutionTraces() {
       } else if (trace.status === 'end' || trace.status === 'error') {
         activeTraceIds.current.delete(trace.trace_id);
         // Only mark as inactive if no other traces are active for this tool call
+        // (collect finished trace IDs once instead of rescanning all traces per start trace)
+        const finishedTraceIds = new Set<string>();
+        for (const t of newTraces) {
+          if (t.status === 'end' || t.status === 'error') {
+            finishedTraceIds.add(t.trace_id);
+          }
+        }
         const hasActiveTraces = newTraces.some(
-          t => t.status === 'start' && !newTraces.some(
-            t2 => (t2.status === 'end' || t2.status === 'error') && t2.trace_id === t.trace_id
-          )
+          t => t.status === 'start' && !finishedTraceIds.has(t.trace_id)
         );
         isActive = hasActiveTraces;
       }
@@ -292,6 +297,20 @@ export function useExecutionTraces() {
 
 // Helper functions to generate labels (matching backend logic)
 
+// Common API call patterns used to label code execution traces (compiled once at module load)
+const CODE_API_PATTERNS: Array<{ regex: RegExp; format: (m: RegExpMatchArray) => string }> = [
+  // Graph API calls
+  { regex: /graph\.(get|post|patch|delete)\s*\(\s*['"`]([^'"`]+)['"`]/i, format: (m: RegExpMatchArray) => `${m[1].toUpperCase()} ${m[2]}` },
+  // Web/HTTP calls
+  { regex: /web\.(get|post|patch|put|delete)\s*\(\s*['"`]([^'"`]+)['"`]/i, format: (m: RegExpMatchArray) => `${m[1].toUpperCase()} ${m[2].slice(0, 30)}${m[2].length > 30 ? '...' : ''}` },
+  // Tavily search
+  { regex: /tavily\.(search|quickSearch)\s*\(\s*['"`]([^'"`]+)['"`]/i, format: (m: RegExpMatchArray) => `Search: "${m[2].slice(0, 30)}${m[2].length > 30 ? '...' : ''}"` },
+  // Skills operations
+  { regex: /skills\.(list|read|create|edit|remove)\s*\(/i, format: (m: RegExpMatchArray) => `${m[1]} skills` },
+  // Math operations
+  { regex: /math\.(evaluate|simplify|derivative)\s*\(/i, format: (m: RegExpMatchArray) => `Math ${m[1]}` },
+];
+
 /**
  * Extract a meaningful description from TypeScript code
  * Looks for API calls like graph.get(), web.post(), tavily.search(), etc.
@@ -299,21 +318,7 @@ export function useExecutionTraces() {
 function getCodeDescription(code: string | undefined, prefix: string): string {
   if (!code) return `${prefix} code`;
   
-  // Look for common API patterns
-  const patterns = [
-    // Graph API calls
-    { regex: /graph\.(get|post|patch|delete)\s*\(\s*['"`]([^'"`]+)['"`]/i, format: (m: RegExpMatchArray) => `${m[1].toUpperCase()} ${m[2]}` },
-    // Web/HTTP calls
-    { regex: /web\.(get|post|patch|put|delete)\s*\(\s*['"`]([^'"`]+)['"`]/i, format: (m: RegExpMatchArray) => `${m[1].toUpperCase()} ${m[2].slice(0, 30)}${m[2].length > 30 ? '...' : ''}` },
-    // Tavily search
-    { regex: /tavily\.(search|quickSearch)\s*\(\s*['"`]([^'"`]+)['"`]/i, format: (m: RegExpMatchArray) => `Search: "${m[2].slice(0, 30)}${m[2].length > 30 ? '...' : ''}"` },
-    // Skills operations
-    { regex: /skills\.(list|read|create|edit|remove)\s*\(/i, format: (m: RegExpMatchArray) => `${m[1]} skills` },
-    // Math operations
-    { regex: /math\.(evaluate|simplify|derivative)\s*\(/i, format: (m: RegExpMatchArray) => `Math ${m[1]}` },
-  ];
-  
-  for (const { regex, format } of patterns) {
+  for (const { regex, format } of CODE_API_PATTERNS) {
     const match = code.match(regex);
     if (match) {
       return `${prefix}: ${format(match)}`;
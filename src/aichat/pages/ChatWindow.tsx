@@ -13,7 +13,7 @@ import MessageItem from "../components/ChatMessageItem";
 import { MessageCache } from "../utils/memory_cache";
 import { Skeleton } from "@/components/ui/skeleton";
 import { LoadingWidget } from "@/components/ui/loading-widget";
-import { convertToChatMessages, HOST } from "../utils/utils";
+import { convertToChatMessages, HOST, DEBUG_STREAM } from "../utils/utils";
 import { createWSManager } from "../utils/ws";
 import ToolMessageRenderer, { ToolCallMap } from "../components/ToolMessageRenderer";
 import NewChat from "../components/NewChat";
@@ -29,16 +29,16 @@ import { useTheme } from "@/lib/theme-provider";
 
 const wsManager = createWSManager(HOST);
 
-function ChatWindow() {
-  // Lightweight streaming debug logger. Enable with: localStorage.setItem('debug_stream','1')
-  const DEBUG_STREAM = typeof window !== 'undefined' && localStorage.getItem('debug_stream') === '1'
-  // eslint-disable-next-line @typescript-eslint/no-explicit-any
-  const debug = (...args: any[]) => {
-    if (DEBUG_STREAM) {
-      // eslint-disable-next-line no-console
-      console.log('[chat-stream]', ...args)
-    }
+// Lightweight streaming debug logger, gated by DEBUG_STREAM (read once at module load, not per render)
+// eslint-disable-next-line @typescript-eslint/no-explicit-any
+const debug = (...args: any[]) => {
+  if (DEBUG_STREAM) {
+    // eslint-disable-next-line no-console
+    console.log('[chat-stream]', ...args)
   }
+}
+
+function ChatWindow() {
   const { open, openMobile, isMobile } = useSidebar();
   const [gettingResponse, setGettingResponse] = useState<boolean>(false);
   const [messages, setMessages] = useState<Message[]>([]);
@@ -406,16 +406,15 @@ function ChatWindow() {
     const currentConversationId = conversationId;
 
     if (isNewChat) {
-      console.log("isNewChat", currentConversationId);
-      console.log("currentConversationId", currentConversationId);
-      console.log("id", id);
+      debug('new_chat', currentConversationId);
       navigate(`/chat/${currentConversationId}`, { replace: true }); 
       const newChats = [...chats];
+      const now = new Date().toISOString();
       newChats.unshift({
         id: currentConversationId,
         title: "New Chat",
-        created_at: new Date().toISOString(),
-        updated_at: new Date().toISOString(),
+        created_at: now,
+        updated_at: now,
       });
       setChats(newChats);
     }
@@ -489,7 +488,6 @@ function ChatWindow() {
       // Handle execution traces (for real-time tool execution visualization)
       // These are UI-only and NOT stored in chat history
       if (data.type === "execution_trace") {
-        console.log('[ChatWindow] Received trace:', data.status, data.label);
         handleTrace(data);
         debug('ws:trace', data.status, data.label);
         return; // Don't process as chat message - traces are non-semantic
@@ -498,7 +496,7 @@ function ChatWindow() {
       // Handle history warnings (when model adapts conversation history and some content is filtered)
       // These appear when switching between models with incompatible features (e.g., images, files)
       if (data.type === "history_warnings") {
-        console.log('[ChatWindow] History warnings:', data.warnings);
+        debug('ws:history_warnings', data.warnings);
         setHistoryWarnings(data.warnings || []);
         // Auto-dismiss warnings after 10 seconds
         setTimeout(() => setHistoryWarnings([]), 10000);
@@ -534,6 +532,11 @@ function ChatWindow() {
       if (data.type === "done" || data.type === "stopped" || data.type === "error") {
         debug('ws:terminal', data.type);
         setGettingResponse(false);
+        // Persist from the latest state: queued updaters (and their setDeferred calls) run before this one
+        setMessages(prev => {
+          MessageCache.set(currentConversationId, prev);
+          return prev;
+        });
         if (data.type === "error") {
           console.error("WebSocket error:", data.error || data.message);
         }
@@ -570,7 +573,7 @@ function ChatWindow() {
                    (msg.content as any).tool_call_id?.startsWith('temp_')
           );
           
-          console.log('[TOOL_RESULT]', data.function_name, 'realId:', data.function_id, 'foundTempCallAt:', toolCallIndex);
+          debug('tool_result', data.function_name, 'realId:', data.function_id, 'foundTempCallAt:', toolCallIndex);
           
           if (toolCallIndex !== -1) {
             // Update the temporary ID with the real one
@@ -578,8 +581,7 @@ function ChatWindow() {
             const updatedToolCall = { ...currentMessageState[toolCallIndex] };
             (updatedToolCall.content as any).tool_call_id = data.function_id;
             currentMessageState[toolCallIndex] = updatedToolCall;
-            console.log('[ID_UPDATE]', data.function_name, 'from:', oldId, 'to:', data.function_id);
-            debug('updated_tool_call_id', data.function_name, data.function_id);
+            debug('updated_tool_call_id', data.function_name, 'from:', oldId, 'to:', data.function_id);
           } else {
             console.warn('[NO_MATCH]', 'Could not find tool_call to update for', data.function_name);
           }
@@ -594,7 +596,7 @@ function ChatWindow() {
           };
           currentMessageState.push(newToolResultMessage);
           debug('tool_result', data.function_name, 'id:', data.function_id);
-          MessageCache.set(currentConversationId, [...currentMessageState]);
+          MessageCache.setDeferred(currentConversationId, [...currentMessageState]);
           return currentMessageState;
         });
         return;
@@ -647,12 +649,11 @@ function ChatWindow() {
                 }
               };
               currentMessageState.push(newToolCallMessage);
-              console.log('[TOOL_CALL]', part.functionCall.name, 'hasBackendId:', hasId, 'id:', toolCallId);
-              debug('raw_tool_call', part.functionCall.name, 'id:', toolCallId);
+              debug('raw_tool_call', part.functionCall.name, 'hasBackendId:', hasId, 'id:', toolCallId);
             }
           }
           
-          MessageCache.set(currentConversationId, [...currentMessageState]);
+          MessageCache.setDeferred(currentConversationId, [...currentMessageState]);
           return currentMessageState;
         });
         return;
@@ -726,7 +727,7 @@ function ChatWindow() {
         }
 
         if (messagesChanged) {
-          MessageCache.set(currentConversationId, [...currentMessageState]);
+          MessageCache.setDeferred(currentConversationId, [...currentMessageState]);
           return currentMessageState;
         }
         return prevMessages;
@@ -760,6 +761,7 @@ function ChatWindow() {
         debug('ws:closed', sessionId, code, reason);
         // Stop loading state on any close (expected or unexpected)
         setGettingResponse(false);
+        MessageCache.flush(sessionId);
       });
       
       // Create new subscription (will create new WebSocket connection)
@@ -770,28 +772,21 @@ function ChatWindow() {
       abortControllerRef.current = false;
       
       // Create fresh WebSocket connection for this message
-      ensureSubscription();
-      
-      // Wait for WebSocket to be ready
+      const connectStart = performance.now();
+      await ensureSubscription();
+
+      // Wait for WebSocket to be ready (event-driven, so the message goes out as soon as it opens)
       const maxWaitTime = 5000; // 5 seconds max
-      const checkInterval = 100; // Check every 100ms
-      const maxAttempts = maxWaitTime / checkInterval;
-      
-      let connected = false;
-      for (let i = 0; i < maxAttempts; i++) {
+      const connection = await wsManager.waitForOpen(currentConversationId, maxWaitTime);
+      if (connection === "open") {
+        debug('ws:connected', `Connection ready after ${Math.round(performance.now() - connectStart)}ms`);
+      } else {
         const wsState = wsManager.getState(currentConversationId);
-        if (wsState === WebSocket.OPEN) {
-          connected = true;
-          debug('ws:connected', `Connection ready after ${i * checkInterval}ms`);
-          break;
+        console.error('[WS] Connection failed:', connection, 'State:', wsState, 'Expected:', WebSocket.OPEN);
+        if (connection === "closed") {
+          throw new Error("WebSocket connection closed before it could be opened");
         }
-        await new Promise(resolve => setTimeout(resolve, checkInterval));
-      }
-
-      if (!connected) {
-        const wsState = wsManager.getState(currentConversationId);
-        console.error('[WS] Connection failed. State:', wsState, 'Expected:', WebSocket.OPEN);
-        throw new Error(`WebSocket connection timeout. State: ${wsState}`);
+        throw new Error(`WebSocket connection timeout after ${maxWaitTime}ms. State: ${wsState}`);
       }
 
       // Send message via WebSocket in Gemini API format
@@ -817,6 +812,13 @@ function ChatWindow() {
     } catch (error) {
       console.error("Error sending message:", error);
       setGettingResponse(false);
+
+      // Stop any background reconnect, the message was never sent on it
+      if (unsubscribeWSRef.current) {
+        try { unsubscribeWSRef.current(); } catch {}
+        unsubscribeWSRef.current = null;
+      }
+      wsManager.close(currentConversationId);
       
       // Revert optimistic messages (user + assistant placeholder)
       setMessages(prev => {
@@ -16,6 +16,8 @@ export interface Conversation {
 const CURRENT_DB_VERSION = "1.0.9";
 const DB_VERSION_KEY = "indexeddb_version";
 
+type StoreName = "conversations" | "messages" | "prism" | "workflows";
+
 //static class to access the message cache
 // Export the DB class
 export class DB {
@@ -138,22 +140,18 @@ export class DB {
     });
   }
 
-  public static getStoreRead(
-    name: "conversations" | "messages" | "prism" | "workflows",
-    mode: IDBTransactionMode = "readonly"
-  ) {
+  private static getStore(name: StoreName, mode: IDBTransactionMode) {
     if (!DB.inited) throw new Error("DB not initialized");
     if (!DB.db) throw new Error("DB not initialized");
     return DB.db.transaction(name, mode).objectStore(name);
   }
 
-  public static getStoreWrite(
-    name: "conversations" | "messages" | "prism" | "workflows",
-    mode: IDBTransactionMode = "readwrite"
-  ) {
-    if (!DB.inited) throw new Error("DB not initialized");
-    if (!DB.db) throw new Error("DB not initialized");
-    return DB.db.transaction(name, mode).objectStore(name);
+  public static getStoreRead(name: StoreName, mode: IDBTransactionMode = "readonly") {
+    return DB.getStore(name, mode);
+  }
+
+  public static getStoreWrite(name: StoreName, mode: IDBTransactionMode = "readwrite") {
+    return DB.getStore(name, mode);
   }
 
   public static async getMessageHistory(id: string): Promise<Message[]> {
@@ -426,23 +424,50 @@ export class MessageCache {
 
   // Method to manually invalidate a conversation's cache (called from sync logic)
   public static invalidate(conversationId: string) {
+    MessageCache.remove(conversationId);
+    
+    // Notify listeners
+    MessageCache.notifyInvalidation(conversationId);
+    
+    console.log(`[MessageCache.invalidate] Cleared cache for ${conversationId}`);
+  }
+
+  // Drop a conversation's cached messages, including any queued write-behind snapshot,
+  // without notifying listeners (used when the conversation itself is deleted)
+  public static remove(conversationId: string) {
     // Remove from sessionStorage
     sessionStorage.removeItem(`messages-${conversationId}`);
     sessionStorage.removeItem(`messages-raw-count-${conversationId}`);
+    // Don't let refetches join a request that started before the invalidation
+    MessageCache.inflightFetches.delete(conversationId);
+    MessageCache.cancelDeferred(conversationId);
     
     // Remove from IndexedDB
     DB.deleteMessageHistory(conversationId).catch(error => {
       console.error(`Error deleting message history for ${conversationId}:`, error);
     });
-    
-    // Notify listeners
-    MessageCache.notifyInvalidation(conversationId);
-    
-    console.log(`[MessageCache.invalidate] Cleared cache for ${conversationId}`);
   }
 
-  //fetches message history and returns it also sets cache
-  private static async fetchMessageHistoryNoCache(
+  // In-flight history fetches, so concurrent callers for the same conversation share one request
+  private static inflightFetches = new Map<string, Promise<Message[]>>();
+
+  //fetches message history and returns it also sets cache (joins a fetch already in flight)
+  private static fetchMessageHistoryNoCache(id: string): Promise<Message[]> {
+    return MessageCache.inflightFetches.get(id) ?? MessageCache.startFetch(id);
+  }
+
+  // Starts a new history request and registers it as the in-flight fetch for this conversation
+  private static startFetch(id: string): Promise<Message[]> {
+    const fetchPromise = MessageCache.doFetchMessageHistory(id).finally(() => {
+      if (MessageCache.inflightFetches.get(id) === fetchPromise) {
+        MessageCache.inflightFetches.delete(id);
+      }
+    });
+    MessageCache.inflightFetches.set(id, fetchPromise);
+    return fetchPromise;
+  }
+
+  private static async doFetchMessageHistory(
     id: string
   ): Promise<Message[]> {
     const url = new URL(`${HOST}/api/v1/chats/conversations/${id}/messages`);
@@ -477,9 +502,10 @@ export class MessageCache {
     }
   }
 
-  // Public helper to force-refresh from server and update caches
+  // Public helper to force-refresh from server and update caches.
+  // Never joins an older in-flight fetch; later callers share this fresh one instead
   public static async refreshFromServer(id: string): Promise<Message[]> {
-    const messages = await MessageCache.fetchMessageHistoryNoCache(id);
+    const messages = await MessageCache.startFetch(id);
     await MessageCache.set(id, messages);
     return messages;
   }
@@ -498,6 +524,9 @@ export class MessageCache {
   }
 
   public static has(id: string): boolean {
+    if (MessageCache.pendingWrites.has(id)) {
+      return true;
+    }
     //checks local storage
     const messages = sessionStorage.getItem(`messages-${id}`);
     if (messages) {
@@ -507,9 +536,14 @@ export class MessageCache {
   }
 
   public static async get(id: string): Promise<Message[]> {
+    // Serve writes that haven't been flushed yet
+    const pending = MessageCache.pendingWrites.get(id);
+    if (pending) {
+      return pending;
+    }
     const messages = sessionStorage.getItem(`messages-${id}`);
     if (messages) {
-      MessageCache.set(id, JSON.parse(messages));
+      // Already persisted in both stores; parse once and skip re-writing it
       return JSON.parse(messages);
     }
     const dbMessages = await DB.getMessageHistory(id);
@@ -521,6 +555,9 @@ export class MessageCache {
   }
 
   public static async set(id: string, messages: Message[]) {
+    // A direct write supersedes any queued write-behind snapshot
+    MessageCache.cancelDeferred(id);
+
     //if empty array, don't set cache
     if (messages.length === 0) {
       return;
@@ -549,10 +586,57 @@ export class MessageCache {
       console.error("Failed to store messages in IndexedDB:", error);
     }
   }
+
+  // Write-behind snapshots, keyed by conversation: streaming updates land here and are
+  // persisted once per WRITE_BEHIND_DELAY instead of re-serializing the chat on every delta
+  private static pendingWrites = new Map<string, Message[]>();
+  private static flushTimers = new Map<string, number>();
+  private static WRITE_BEHIND_DELAY = 500; // ms
+
+  // Queue messages to be written to sessionStorage/IndexedDB shortly; reads see them immediately
+  public static setDeferred(id: string, messages: Message[]) {
+    MessageCache.pendingWrites.set(id, messages);
+    if (MessageCache.flushTimers.has(id)) return;
+
+    const timer = window.setTimeout(() => {
+      MessageCache.flush(id);
+    }, MessageCache.WRITE_BEHIND_DELAY);
+    MessageCache.flushTimers.set(id, timer);
+  }
+
+  // Persist any queued write for a conversation now (call when a stream finishes)
+  public static async flush(id: string) {
+    const pending = MessageCache.pendingWrites.get(id);
+    MessageCache.cancelDeferred(id);
+    if (pending) {
+      await MessageCache.set(id, pending);
+    }
+  }
+
+  private static cancelDeferred(id: string) {
+    const timer = MessageCache.flushTimers.get(id);
+    if (timer !== undefined) {
+      clearTimeout(timer);
+      MessageCache.flushTimers.delete(id);
+    }
+    MessageCache.pendingWrites.delete(id);
+  }
 }
 
 export class ConversationCache {
-  public static async fetchConversationsNoCache(): Promise<Conversation[]> {
+  // In-flight list fetch, shared by concurrent callers (e.g. get() falling through and a background refresh)
+  private static fetchPromise: Promise<Conversation[]> | null = null;
+
+  public static fetchConversationsNoCache(): Promise<Conversation[]> {
+    if (!ConversationCache.fetchPromise) {
+      ConversationCache.fetchPromise = ConversationCache.doFetchConversations().finally(() => {
+        ConversationCache.fetchPromise = null;
+      });
+    }
+    return ConversationCache.fetchPromise;
+  }
+
+  private static async doFetchConversations(): Promise<Conversation[]> {
     try {
       // Import here to avoid circular dependency
       const { authFetch } = await import("@/lib/utils");
@@ -658,7 +742,6 @@ export class ConversationCache {
       const conversations = sessionStorage.getItem(`conversations`);
       if (conversations) {
         console.log("Found conversations in session storage");
-        ConversationCache.set(JSON.parse(conversations));
         return JSON.parse(conversations);
       }
 
@@ -746,6 +829,37 @@ export class PrismaCache {
     "javascript",
   ];
 
+  // Bundled Prism language components, loaded on demand (built once, not per loadLanguage call)
+  // This is a simplified version - full implementation would use components.json
+  static languageImports: { [key: string]: () => Promise<any> } = {
+    // @ts-ignore - prismjs components don't have type definitions
+    typescript: () => import("prismjs/components/prism-typescript"),
+    // @ts-ignore
+    python: () => import("prismjs/components/prism-python"),
+    // @ts-ignore
+    java: () => import("prismjs/components/prism-java"),
+    // @ts-ignore
+    go: () => import("prismjs/components/prism-go"),
+    // @ts-ignore
+    rust: () => import("prismjs/components/prism-rust"),
+    // @ts-ignore
+    cpp: () => import("prismjs/components/prism-cpp"),
+    // @ts-ignore
+    c: () => import("prismjs/components/prism-c"),
+    // @ts-ignore
+    bash: () => import("prismjs/components/prism-bash"),
+    // @ts-ignore
+    shell: () => import("prismjs/components/prism-bash"),
+    // @ts-ignore
+    sql: () => import("prismjs/components/prism-sql"),
+    // @ts-ignore
+    json: () => import("prismjs/components/prism-json"),
+    // @ts-ignore
+    yaml: () => import("prismjs/components/prism-yaml"),
+    // @ts-ignore
+    markdown: () => import("prismjs/components/prism-markdown"),
+  };
+
   private static async fetchPrismNoCache(language: string): Promise<string> {
     const { authFetch } = await import("@/lib/utils");
     const response = await authFetch(
@@ -796,43 +910,13 @@ export class PrismaCache {
       return; // Already loaded
     }
     try {
-      // Try to dynamically import Prism language components
-      // This is a simplified version - full implementation would use components.json
-      const languageMap: { [key: string]: () => Promise<any> } = {
-        // @ts-ignore - prismjs components don't have type definitions
-        typescript: () => import("prismjs/components/prism-typescript"),
-        // @ts-ignore
-        python: () => import("prismjs/components/prism-python"),
-        // @ts-ignore
-        java: () => import("prismjs/components/prism-java"),
-        // @ts-ignore
-        go: () => import("prismjs/components/prism-go"),
-        // @ts-ignore
-        rust: () => import("prismjs/components/prism-rust"),
-        // @ts-ignore
-        cpp: () => import("prismjs/components/prism-cpp"),
-        // @ts-ignore
-        c: () => import("prismjs/components/prism-c"),
-        // @ts-ignore
-        bash: () => import("prismjs/components/prism-bash"),
-        // @ts-ignore
-        shell: () => import("prismjs/components/prism-bash"),
-        // @ts-ignore
-        sql: () => import("prismjs/components/prism-sql"),
-        // @ts-ignore
-        json: () => import("prismjs/components/prism-json"),
-        // @ts-ignore
-        yaml: () => import("prismjs/components/prism-yaml"),
-        // @ts-ignore
-        markdown: () => import("prismjs/components/prism-markdown"),
-      };
-
       const normalizedLang = language.toLowerCase();
-      if (languageMap[normalizedLang]) {
-        await languageMap[normalizedLang]();
+      const importLanguage = PrismaCache.languageImports[normalizedLang];
+      if (importLanguage) {
+        await importLanguage();
         PrismaCache.loadedLanguages[language] = true;
       } else {
-        // Try fetching from server if not in languageMap
+        // Try fetching from server if not in languageImports
         const script = await PrismaCache.get(language);
         if (script) {
           try {
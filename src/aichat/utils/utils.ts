@@ -1,5 +1,7 @@
 import { ContentItem, Message } from "../models/models";
 export const HOST = import.meta.env.VITE_CHAT_HOST || "";
+// Verbose streaming/WebSocket logs. Enable with: localStorage.setItem('debug_stream','1') and reload.
+export const DEBUG_STREAM = typeof window !== 'undefined' && localStorage.getItem('debug_stream') === '1';
 
 // Go backend message format
 interface DBMessage {
@@ -57,7 +59,9 @@ export function convertToChatMessages(messages: DBMessage[]): ChatMessage[] {
         
         // Handle function_call (tool_call)
         if (part.functionCall) {
-          console.log('[convertToChatMessages] Found functionCall:', part.functionCall.name, 'id:', part.functionCall.id);
+          if (DEBUG_STREAM) {
+            console.log('[convertToChatMessages] Found functionCall:', part.functionCall.name, 'id:', part.functionCall.id);
+          }
           toolCalls.push({
             role: "tool_call",
             content: {
@@ -70,7 +74,9 @@ export function convertToChatMessages(messages: DBMessage[]): ChatMessage[] {
         
         // Handle function_response (tool_result)
         if (part.function_response) {
-          console.log('[convertToChatMessages] Found function_response:', part.function_response.name, 'id:', part.function_response.id);
+          if (DEBUG_STREAM) {
+            console.log('[convertToChatMessages] Found function_response:', part.function_response.name, 'id:', part.function_response.id);
+          }
           toolResults.push({
             role: "tool_result",
             content: {
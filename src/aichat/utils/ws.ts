@@ -1,5 +1,17 @@
+import { DEBUG_STREAM } from "./utils";
+
 export type EventHandler = (data: any) => void;
 export type CloseHandler = (sessionId: string, code: number, reason: string) => void;
+export type WaitForOpenResult = "open" | "closed" | "timeout";
+
+// Reconnect backoff: exponentially growing window (1s, 2s, 4s, ... capped at 30s), jittered to 50-100% of it
+const RECONNECT_BASE_DELAY_MS = 1000;
+const RECONNECT_MAX_DELAY_MS = 30000;
+// Stop retrying a session after this many consecutive failed reconnects
+const RECONNECT_MAX_ATTEMPTS = 8;
+// A socket only counts as recovered once it stays open this long or delivers a message,
+// so a server that accepts and immediately closes still runs into the cap
+const RECONNECT_STABLE_MS = 5000;
 
 /**
  * WebSocket manager for per-session connections to the Go backend.
@@ -12,7 +24,9 @@ class SessionWSManager {
   private urlBase: string;
   private reconnectTimers: Map<string, number> = new Map();
   private shouldReconnect: Map<string, boolean> = new Map();
+  private reconnectAttempts: Map<string, number> = new Map();
   private sessionModels: Map<string, string> = new Map(); // Track model per session
+  private socketWaiters: Map<string, Set<() => void>> = new Map(); // Notified when connect() creates a socket
 
   constructor(urlBase: string) {
     // Convert http/https to ws/wss
@@ -47,22 +61,21 @@ class SessionWSManager {
     // Create WebSocket URL matching Go backend: /api/v1/chat/ws/{session_id}
     let wsUrl = `${this.urlBase}/api/v1/chat/ws/${sessionId}`;
     
-    console.log(`[WS] Model ID received:`, modelId, 'Type:', typeof modelId);
-    
     // Add query parameters (model and token)
     const params = new URLSearchParams();
     if (modelId) {
-      console.log(`[WS] Adding model parameter:`, modelId);
       params.append('model', modelId);
-    } else {
-      console.log(`[WS] No model ID provided, using backend default`);
+    }
+    if (DEBUG_STREAM) {
+      console.log(`[WS] Model:`, modelId ?? 'backend default');
     }
     if (token) {
       params.append('token', token);
     }
     
-    if (params.toString()) {
-      wsUrl += `?${params.toString()}`;
+    const query = params.toString();
+    if (query) {
+      wsUrl += `?${query}`;
     }
     
     console.log(`[WS] Connecting to: ${wsUrl.replace(token, 'TOKEN_HIDDEN')}`);
@@ -71,8 +84,20 @@ class SessionWSManager {
     this.connections.set(sessionId, ws);
     this.shouldReconnect.set(sessionId, true);
 
+    const waiters = this.socketWaiters.get(sessionId);
+    if (waiters) {
+      this.socketWaiters.delete(sessionId);
+      for (const notify of waiters) notify();
+    }
+
+    let stableTimer: number | undefined;
+
     ws.onopen = () => {
       console.log(`[WS] Connected to session: ${sessionId}`);
+      stableTimer = window.setTimeout(() => {
+        stableTimer = undefined;
+        this.reconnectAttempts.delete(sessionId);
+      }, RECONNECT_STABLE_MS);
       // Clear any reconnect timer
       const timer = this.reconnectTimers.get(sessionId);
       if (timer !== undefined) {
@@ -84,7 +109,15 @@ class SessionWSManager {
     ws.onmessage = (evt) => {
       try {
         const data = JSON.parse(evt.data as string);
-        console.log(`[WS] Message received:`, data.type || 'unknown');
+        if (stableTimer !== undefined) {
+          clearTimeout(stableTimer);
+          stableTimer = undefined;
+          this.reconnectAttempts.delete(sessionId);
+        }
+        // Fires once per streamed delta, so only log when stream debugging is on
+        if (DEBUG_STREAM) {
+          console.log(`[WS] Message received:`, data.type || 'unknown');
+        }
         
         // Dispatch to all handlers for this session
         const listeners = this.handlers.get(sessionId);
@@ -103,12 +136,17 @@ class SessionWSManager {
     };
 
     ws.onclose = (event) => {
+      clearTimeout(stableTimer);
       console.log(`[WS] Disconnected from session ${sessionId}:`, {
         code: event.code,
         reason: event.reason,
         wasClean: event.wasClean,
         url: wsUrl
       });
+      // A replaced socket can close after connect() registered its successor; leave the new one alone
+      if (this.connections.get(sessionId) !== ws) {
+        return;
+      }
       this.connections.delete(sessionId);
       
       // Notify close handlers (for UI cleanup like stopping loading state)
@@ -127,14 +165,21 @@ class SessionWSManager {
       const hasHandlers = this.handlers.get(sessionId)?.size || 0 > 0;
       const shouldReconnect = this.shouldReconnect.get(sessionId);
       
-      if (hasHandlers && shouldReconnect) {
-        console.log(`[WS] Scheduling reconnect for session ${sessionId}...`);
+      const attempt = this.reconnectAttempts.get(sessionId) ?? 0;
+      if (hasHandlers && shouldReconnect && attempt >= RECONNECT_MAX_ATTEMPTS) {
+        console.warn(`[WS] Giving up on session ${sessionId} after ${attempt} reconnect attempts`);
+        this.reconnectAttempts.delete(sessionId);
+      } else if (hasHandlers && shouldReconnect) {
+        this.reconnectAttempts.set(sessionId, attempt + 1);
+        const backoffWindow = Math.min(RECONNECT_MAX_DELAY_MS, RECONNECT_BASE_DELAY_MS * 2 ** attempt);
+        const delay = backoffWindow * (0.5 + Math.random() * 0.5);
+        console.log(`[WS] Scheduling reconnect for session ${sessionId} in ${Math.round(delay)}ms (attempt ${attempt + 1})...`);
         const timer = window.setTimeout(() => {
           this.reconnectTimers.delete(sessionId);
           // Reconnect with the same model that was used initially
           const model = this.sessionModels.get(sessionId);
           this.connect(sessionId, model);
-        }, 2000);
+        }, delay);
         this.reconnectTimers.set(sessionId, timer);
       }
     };
@@ -188,6 +233,7 @@ class SessionWSManager {
         this.handlers.delete(sessionId);
         this.shouldReconnect.set(sessionId, false);
         this.sessionModels.delete(sessionId); // Clear stored model
+        this.reconnectAttempts.delete(sessionId);
         
         const ws = this.connections.get(sessionId);
         if (ws && ws.readyState === WebSocket.OPEN) {
@@ -258,6 +304,7 @@ class SessionWSManager {
     this.handlers.delete(sessionId);
     this.closeHandlers.delete(sessionId); // Clear close handlers
     this.sessionModels.delete(sessionId); // Clear stored model
+    this.reconnectAttempts.delete(sessionId);
     
     const timer = this.reconnectTimers.get(sessionId);
     if (timer !== undefined) {
@@ -266,6 +313,76 @@ class SessionWSManager {
     }
   }
 
+  /**
+   * Resolve as soon as a session's WebSocket is open. If the socket closes while an automatic
+   * reconnect is scheduled, keep waiting on the replacement socket until the deadline.
+   */
+  async waitForOpen(sessionId: string, timeoutMs: number): Promise<WaitForOpenResult> {
+    const deadline = Date.now() + timeoutMs;
+
+    for (;;) {
+      const ws = this.connections.get(sessionId);
+      if (ws?.readyState === WebSocket.OPEN) return "open";
+
+      const remaining = deadline - Date.now();
+      if (remaining <= 0) return "timeout";
+
+      if (ws?.readyState === WebSocket.CONNECTING) {
+        const result = await this.waitForSocket(ws, remaining);
+        if (result === "timeout") return result;
+        // Re-check the map: send() uses whichever socket is registered there now
+        continue;
+      }
+
+      // No live socket: only a pending reconnect can still bring one up
+      if (!this.reconnectTimers.has(sessionId)) return "closed";
+      if (!(await this.waitForNextSocket(sessionId, remaining))) return "timeout";
+    }
+  }
+
+  /**
+   * Wait for a single socket to leave the CONNECTING state
+   */
+  private waitForSocket(ws: WebSocket, timeoutMs: number): Promise<WaitForOpenResult> {
+    return new Promise((resolve) => {
+      const finish = (result: WaitForOpenResult) => {
+        clearTimeout(timer);
+        ws.removeEventListener('open', onOpen);
+        ws.removeEventListener('close', onClose);
+        resolve(result);
+      };
+      const onOpen = () => finish("open");
+      const onClose = () => finish("closed");
+      const timer = window.setTimeout(() => finish("timeout"), timeoutMs);
+      ws.addEventListener('open', onOpen);
+      ws.addEventListener('close', onClose);
+    });
+  }
+
+  /**
+   * Wait for connect() to create the next socket for a session (false on timeout)
+   */
+  private waitForNextSocket(sessionId: string, timeoutMs: number): Promise<boolean> {
+    return new Promise((resolve) => {
+      if (!this.socketWaiters.has(sessionId)) {
+        this.socketWaiters.set(sessionId, new Set());
+      }
+      const waiters = this.socketWaiters.get(sessionId)!;
+      const notify = () => {
+        clearTimeout(timer);
+        resolve(true);
+      };
+      const timer = window.setTimeout(() => {
+        waiters.delete(notify);
+        if (waiters.size === 0 && this.socketWaiters.get(sessionId) === waiters) {
+          this.socketWaiters.delete(sessionId);
+        }
+        resolve(false);
+      }, timeoutMs);
+      waiters.add(notify);
+    });
+  }
+
   /**
    * Get the current connection state for a session
    */
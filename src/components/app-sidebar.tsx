@@ -172,7 +172,7 @@ export function AppSidebar() {
 
       // Clear caches
       await ConversationCache.delete(chatId);
-      sessionStorage.removeItem(`messages-${chatId}`);
+      MessageCache.remove(chatId);
 
       // Navigate away if current chat was deleted
       if (currentChatId === chatId) {